@@ -6,99 +6,238 @@ A utility to combine multiple PDFs into a single file with automatic bookmark cr
 
 import os
 import sys
-import glob
-from pathlib import Path
 from typing import List, Tuple
-import PyPDF2
-from PyPDF2 import PdfReader, PdfWriter
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import threading
+import collections
+import concurrent.futures
+import functools
+import mmap
 import re
 
+# Compiled once; natural_sort_key runs O(N log N) times per sort
+_NAT_SPLIT_RE = re.compile(r"(\d+)")
 
+
+def _split_parts(s: str):
+    # Skip the empty boundary tokens re.split emits; ordering is
+    # unchanged since digit runs already rank before text runs
+    return tuple([(0, int(p)) if p.isdigit() else (1, p)
+                  for p in _NAT_SPLIT_RE.split(s.lower()) if p])
+
+
+@functools.lru_cache(maxsize=None)
 def natural_sort_key(path: str, root_folder: str = None):
-    def split_parts(s: str):
-        tokens = re.split(r"(\d+)", s.lower())
-        return tuple((0, int(p)) if p.isdigit() else (1, p) for p in tokens)
     rel_path = os.path.relpath(path, root_folder) if root_folder else os.path.normpath(path)
-    components = rel_path.split(os.sep)
-    return tuple(split_parts(component) for component in components)
+    return tuple([_split_parts(component) for component in rel_path.split(os.sep)])
+
+
+def sort_paths(paths: List[str]) -> List[str]:
+    try:
+        root = os.path.commonpath(paths) if paths else None
+    except Exception:
+        root = None
+    # Key each path exactly once, then sort on the precomputed tuples
+    keyed = [(natural_sort_key(path, root), path) for path in paths]
+    keyed.sort()
+    return [path for _key, path in keyed]
 
 
 class PDFCombiner:
     def __init__(self):
         self.combined_pdf = None
         self.output_path = None
-        
+        # Page counts keyed by (path, mtime, size) so rescans are free
+        self._info_cache = {}
+
     def find_pdf_files(self, folder_path: str) -> List[str]:
         """Find all PDF files in the specified folder."""
-        pdf_pattern = os.path.join(folder_path, "*.pdf")
-        pdf_files = glob.glob(pdf_pattern)
-        # Also include uppercase extension
-        pdf_files += glob.glob(os.path.join(folder_path, "*.PDF"))
+        # One scandir pass with a case-insensitive suffix check covers both
+        # .pdf and .PDF without two glob walks
+        with os.scandir(folder_path) as entries:
+            keyed = [(natural_sort_key(entry.name), entry.path)
+                     for entry in entries
+                     if entry.is_file()
+                     and entry.name.lower().endswith('.pdf')]
         # Sort files naturally (1.pdf, 2.pdf, 10.pdf instead of 1.pdf, 10.pdf, 2.pdf)
-        pdf_files.sort(key=lambda p: natural_sort_key(p, folder_path))
-        return pdf_files
+        keyed.sort()
+        return [path for _key, path in keyed]
     
     def get_pdf_info(self, pdf_path: str) -> Tuple[str, int]:
         """Get PDF filename and page count."""
+        filename = os.path.basename(pdf_path)
+        try:
+            import pikepdf  # Lazy import
+        except ImportError:
+            pikepdf = None
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PdfReader(file)
-                page_count = len(reader.pages)
-                filename = os.path.basename(pdf_path)
-                return filename, page_count
+            stat = os.stat(pdf_path)
+            cache_key = (pdf_path, stat.st_mtime, stat.st_size)
+            page_count = self._info_cache.get(cache_key)
+            if page_count is None:
+                if pikepdf is not None:
+                    # pikepdf resolves the page tree from the xref table
+                    # without parsing every object in the file
+                    with pikepdf.Pdf.open(pdf_path) as pdf:
+                        page_count = len(pdf.pages)
+                else:
+                    from PyPDF2 import PdfReader  # Lazy import
+                    with open(pdf_path, 'rb') as file:
+                        page_count = len(PdfReader(file).pages)
+                self._info_cache[cache_key] = page_count
+            return filename, page_count
         except Exception as e:
             print(f"Error reading {pdf_path}: {e}")
-            return os.path.basename(pdf_path), 0
+            return filename, 0
     
     def combine_pdfs_with_bookmarks(self, pdf_files: List[str], output_path: str) -> bool:
         """Combine PDFs and create bookmarks for each file."""
+        # Ensure deterministic, hierarchical natural ordering
+        pdf_files = sort_paths(pdf_files)
+
+        # Prefer the pikepdf (qpdf) backend when available; it merges through
+        # C++ instead of PyPDF2's Python-level object graph
+        try:
+            import pikepdf  # Lazy import
+        except ImportError:
+            pikepdf = None
+
+        if pikepdf is not None:
+            return self._combine_with_pikepdf(pikepdf, pdf_files, output_path)
+        return self._combine_with_pypdf2(pdf_files, output_path)
+
+    def _combine_with_pikepdf(self, pikepdf, pdf_files: List[str], output_path: str) -> bool:
+        """Combine PDFs using the pikepdf backend."""
+        try:
+            combined = pikepdf.Pdf.new()
+            current_page = 0
+            outline_entries = []
+
+            # Open inputs on a thread pool so parsing the next file overlaps
+            # appending the current one; qpdf releases the GIL while it reads.
+            # Opens are submitted through a small sliding window rather than
+            # all at once, so at most a handful of inputs (and their file
+            # descriptors) are held open ahead of the consumer.
+            # No exists() precheck: the open itself reports a missing file,
+            # saving a stat syscall per input
+            lookahead = 4
+            with concurrent.futures.ThreadPoolExecutor(max_workers=lookahead) as executor:
+                window = collections.deque()
+                next_index = 0
+
+                # Consume in input order so pages and bookmarks stay sorted
+                while window or next_index < len(pdf_files):
+                    while next_index < len(pdf_files) and len(window) < lookahead:
+                        path = pdf_files[next_index]
+                        window.append((path, executor.submit(pikepdf.Pdf.open, path)))
+                        next_index += 1
+                    pdf_path, future = window.popleft()
+                    try:
+                        with future.result() as src:
+                            page_count = len(src.pages)
+                            combined.pages.extend(src.pages)
+
+                            # Create bookmark for this PDF; splitext
+                            # strips only the extension, not '.pdf' elsewhere
+                            # in the name
+                            filename = os.path.basename(pdf_path)
+                            bookmark_name = os.path.splitext(filename)[0]
+
+                            # Bookmark points to the first page of this PDF;
+                            # entries are collected and written in one pass
+                            outline_entries.append((bookmark_name, current_page))
+
+                            current_page += page_count
+
+                    except FileNotFoundError:
+                        print(f"Warning: {pdf_path} not found, skipping...")
+                    except Exception as e:
+                        print(f"Error processing {pdf_path}: {e}")
+                        return False
+
+            # Build the outline tree once, after all pages exist, instead
+            # of reopening and rewriting it per input file
+            with combined.open_outline() as outline:
+                for bookmark_name, page_number in outline_entries:
+                    outline.root.append(
+                        pikepdf.OutlineItem(bookmark_name, page_number)
+                    )
+
+            # Write the combined PDF. Inputs arrive with their streams
+            # already compressed, so skip recompression and the extra
+            # linearization pass; object streams keep the xref compact
+            combined.save(
+                output_path,
+                object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                compress_streams=False,
+                stream_decode_level=pikepdf.StreamDecodeLevel.none,
+                linearize=False,
+            )
+
+            self.combined_pdf = output_path
+            return True
+
+        except Exception as e:
+            print(f"Error combining PDFs: {e}")
+            return False
+
+    def _combine_with_pypdf2(self, pdf_files: List[str], output_path: str) -> bool:
+        """Combine PDFs using the PyPDF2 fallback backend."""
+        try:
+            from PyPDF2 import PdfReader, PdfWriter  # Lazy import
+        except ImportError:
+            print("Error: PyPDF2 is not installed. Please install it using: pip install PyPDF2")
+            return False
+
         try:
             writer = PdfWriter()
             current_page = 0
-            
-            # Ensure deterministic, hierarchical natural ordering
-            try:
-                root = os.path.commonpath(pdf_files) if pdf_files else None
-            except Exception:
-                root = None
-            pdf_files = sorted(pdf_files, key=lambda p: natural_sort_key(p, root))
-            
-            # Process each PDF file
+            outline_entries = []
+
+            # Process each PDF file; a missing file surfaces as
+            # FileNotFoundError from open(), no exists() precheck needed
             for pdf_path in pdf_files:
-                if not os.path.exists(pdf_path):
-                    print(f"Warning: {pdf_path} not found, skipping...")
-                    continue
-                
                 try:
-                    with open(pdf_path, 'rb') as file:
-                        reader = PdfReader(file)
-                        
-                        # Add all pages from this PDF
-                        for page in reader.pages:
-                            writer.add_page(page)
-                        
-                        # Create bookmark for this PDF
-                        filename = os.path.basename(pdf_path)
-                        # Remove .pdf extension for cleaner bookmark names
-                        bookmark_name = filename.replace('.pdf', '')
-                        
-                        # Add bookmark pointing to the first page of this PDF
-                        writer.add_outline_item(
-                            title=bookmark_name,
-                            page_number=current_page
-                        )
-                        
-                        current_page += len(reader.pages)
-                        
+                    # Create bookmark for this PDF; do the string work
+                    # before the file is even opened. splitext strips only
+                    # the extension, not '.pdf' elsewhere in the name
+                    filename = os.path.basename(pdf_path)
+                    bookmark_name = os.path.splitext(filename)[0]
+
+                    # Map the file rather than streaming it; PyPDF2 seeks
+                    # heavily and the mapping serves reads straight from
+                    # the page cache without Python-level buffer copies
+                    with open(pdf_path, 'rb') as file, \
+                            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        reader = PdfReader(mm)
+                        page_count = len(reader.pages)
+
+                        # Add all pages from this PDF in one bulk append
+                        # rather than resolving each page individually
+                        writer.append_pages_from_reader(reader)
+
+                        # Bookmark points to the first page of this PDF;
+                        # entries are collected and added in one pass
+                        outline_entries.append((bookmark_name, current_page))
+
+                        current_page += page_count
+
+                except FileNotFoundError:
+                    print(f"Warning: {pdf_path} not found, skipping...")
                 except Exception as e:
                     print(f"Error processing {pdf_path}: {e}")
                     return False
-            
+
+            # Add all bookmarks once the page tree is final, so the
+            # outline dictionaries are only wired up once
+            for bookmark_name, page_number in outline_entries:
+                writer.add_outline_item(
+                    title=bookmark_name,
+                    page_number=page_number
+                )
+
             # Write the combined PDF
-            with open(output_path, 'wb') as output_file:
+            with open(output_path, 'wb', buffering=1 << 20) as output_file:
                 writer.write(output_file)
             
             self.combined_pdf = output_path
@@ -119,9 +258,42 @@ class PDFCombinerGUI:
         self.combiner = PDFCombiner()
         self.selected_folder = ""
         self.pdf_files = []
-        
+
+        # One shared pool for scans and combines; reusing it avoids
+        # spawning a fresh thread per operation. Submitted futures are
+        # tracked so queued work can be cancelled on window close
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        self._pending_futures = []
+
+        # Model for the scanned PDFs, kept as parallel lists so reading a
+        # row back never needs a Tcl round-trip; the treeview is view-only
+        self._filenames = []
+        self._page_counts = []
+        self._paths = []
+        self._item_to_idx = {}
+        # Bumped on every scan so results from a superseded scan are dropped
+        self._scan_generation = 0
+
         self.setup_ui()
-        
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def _submit(self, fn, *args):
+        """Submit work to the shared pool, tracking it for cancellation."""
+        self._pending_futures = [f for f in self._pending_futures if not f.done()]
+        future = self._executor.submit(fn, *args)
+        self._pending_futures.append(future)
+        return future
+
+    def on_close(self):
+        """Stop background work before tearing down the window."""
+        # Cancel queued jobs by hand (shutdown's cancel_futures needs
+        # Python 3.9, newer than this tool requires) so the non-daemon
+        # workers cannot keep the process alive after the window is gone
+        for future in self._pending_futures:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+        self.root.destroy()
+
     def setup_ui(self):
         """Set up the user interface."""
         # Main frame
@@ -230,36 +402,77 @@ class PDFCombinerGUI:
         # Clear existing items
         for item in self.pdf_tree.get_children():
             self.pdf_tree.delete(item)
-        
-        # Find PDF files
-        self.pdf_files = self.combiner.find_pdf_files(self.selected_folder)
-        
+        self._filenames.clear()
+        self._page_counts.clear()
+        self._paths.clear()
+        self._item_to_idx.clear()
+
+        # Invalidate any scan still in flight; its results would otherwise
+        # land next to this scan's rows
+        self._scan_generation += 1
+        generation = self._scan_generation
+
+        # Find PDF files; the folder may have vanished since browsing, and
+        # unlike the old glob scan os.scandir raises instead of returning
+        # nothing, which would leave the progress bar spinning
+        try:
+            self.pdf_files = self.combiner.find_pdf_files(self.selected_folder)
+        except OSError as e:
+            print(f"Error scanning {self.selected_folder}: {e}")
+            self.pdf_files = []
+
         if not self.pdf_files:
             self.status_var.set("No PDF files found in the selected folder")
             self.progress.stop()
             messagebox.showinfo("No PDFs", "No PDF files were found in the selected folder.")
             return
         
-        # Populate treeview
-        for pdf_path in self.pdf_files:
-            filename, page_count = self.combiner.get_pdf_info(pdf_path)
-            self.pdf_tree.insert("", "end", values=(filename, page_count, pdf_path))
-        
+        # Read page counts on the shared executor; the work is I/O-bound so
+        # threads overlap the per-file open+parse instead of freezing the UI.
+        # Capture the file list so a rescan replacing self.pdf_files cannot
+        # be paired with this scan's futures
+        pdf_files = self.pdf_files
+        futures = [self._submit(self.combiner.get_pdf_info, pdf_path)
+                   for pdf_path in pdf_files]
+
+        def gather_results():
+            # Collect in submission order so the treeview keeps the
+            # natural sort order from find_pdf_files
+            results = [(pdf_path, future.result())
+                       for pdf_path, future in zip(pdf_files, futures)]
+            self.root.after(0, self.scan_complete, generation, results)
+
+        self._submit(gather_results)
+
+    def scan_complete(self, generation, results):
+        """Populate the treeview once the background scan finishes."""
+        # A newer scan started while this one ran; discard the stale rows
+        if generation != self._scan_generation:
+            return
+
+        for pdf_path, (filename, page_count) in results:
+            item = self.pdf_tree.insert("", "end", values=(filename, page_count, pdf_path))
+            self._item_to_idx[item] = len(self._paths)
+            self._filenames.append(filename)
+            self._page_counts.append(page_count)
+            self._paths.append(pdf_path)
+
         self.status_var.set(f"Found {len(self.pdf_files)} PDF files")
         self.progress.stop()
         self.combine_btn.config(state="normal")
-        
+
         # Auto-select all files
         self.select_all_var.set(True)
         self.toggle_selection()
-        
+
     def toggle_selection(self):
         """Toggle selection of all PDF files."""
+        # One selection_set call is one Tcl round-trip and one
+        # <<TreeviewSelect>> event, instead of one of each per row
         if self.select_all_var.get():
-            for item in self.pdf_tree.get_children():
-                self.pdf_tree.selection_add(item)
+            self.pdf_tree.selection_set(self.pdf_tree.get_children())
         else:
-            self.pdf_tree.selection_remove(*self.pdf_tree.selection())
+            self.pdf_tree.selection_set(())
             
     def combine_pdfs(self):
         """Combine the selected PDF files."""
@@ -269,13 +482,15 @@ class PDFCombinerGUI:
             messagebox.showwarning("Warning", "Please select at least one PDF file!")
             return
         
-        # Get selected PDF paths
-        selected_pdfs = []
-        for item in selected_items:
-            values = self.pdf_tree.item(item, "values")
-            selected_pdfs.append(values[2])  # Full path is in column 2
-        # Ensure deterministic order regardless of GUI selection order
-        selected_pdfs.sort(key=lambda p: natural_sort_key(p, self.selected_folder))
+        # Get selected PDF paths from the model, not the treeview rows
+        selected_pdfs = [self._paths[self._item_to_idx[item]] for item in selected_items]
+        # Ensure deterministic order regardless of GUI selection order;
+        # decorate-sort-undecorate on keys computed once per path (and
+        # served from the natural_sort_key cache after the scan)
+        keyed = [(natural_sort_key(path, self.selected_folder), path)
+                 for path in selected_pdfs]
+        keyed.sort()
+        selected_pdfs = [path for _key, path in keyed]
         
         # Get output path
         output_filename = self.output_var.get()
@@ -291,20 +506,32 @@ class PDFCombinerGUI:
             if not result:
                 return
         
-        # Start combining in a separate thread to avoid freezing the UI
+        # Run the combine on the shared executor to avoid freezing the UI
         self.status_var.set("Combining PDFs...")
         self.progress.start()
         self.combine_btn.config(state="disabled")
-        
-        def combine_thread():
-            success = self.combiner.combine_pdfs_with_bookmarks(selected_pdfs, output_path)
-            
-            # Update UI in main thread
-            self.root.after(0, self.combine_complete, success, output_path)
-        
-        thread = threading.Thread(target=combine_thread)
-        thread.daemon = True
-        thread.start()
+
+        future = self._submit(
+            self.combiner.combine_pdfs_with_bookmarks, selected_pdfs, output_path)
+
+        def merge_done(done_future):
+            # Update UI in main thread once the merge finishes; a future
+            # that raised must still clear the busy state instead of
+            # leaving the progress bar spinning forever
+            try:
+                success = done_future.result()
+            except concurrent.futures.CancelledError:
+                return
+            except Exception as e:
+                print(f"Error combining PDFs: {e}")
+                success = False
+            try:
+                self.root.after(0, self.combine_complete, success, output_path)
+            except tk.TclError:
+                # Window was closed while the merge was running
+                pass
+
+        future.add_done_callback(merge_done)
         
     def combine_complete(self, success: bool, output_path: str):
         """Called when PDF combination is complete."""
@@ -327,14 +554,15 @@ class PDFCombinerGUI:
 
 def main():
     """Main function to run the application."""
-    try:
-        # Check if PyPDF2 is available
-        import PyPDF2
-    except ImportError:
-        print("Error: PyPDF2 is not installed.")
-        print("Please install it using: pip install PyPDF2")
+    # Check that a PDF backend exists without importing (and executing)
+    # the whole module just for the availability test
+    import importlib.util
+    if (importlib.util.find_spec("pikepdf") is None
+            and importlib.util.find_spec("PyPDF2") is None):
+        print("Error: no PDF backend is installed.")
+        print("Please install one using: pip install pikepdf (or: pip install PyPDF2)")
         sys.exit(1)
-    
+
     # Create and run the GUI
     app = PDFCombinerGUI()
     app.run()
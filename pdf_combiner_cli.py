@@ -6,118 +6,269 @@ A utility to combine multiple PDFs into a single file with automatic bookmark cr
 
 import os
 import sys
-import glob
 import argparse
-from pathlib import Path
+import collections
+import concurrent.futures
 from typing import List, Tuple
+import functools
+import mmap
 import re
 
+# Compiled once; natural_sort_key runs O(N log N) times per sort
+_NAT_SPLIT_RE = re.compile(r"(\d+)")
 
+
+def _split_parts(s: str):
+    """Tokenize one path component into (digit-run, text-run) natural-order pairs."""
+    # re.split with a capture group emits empty strings at digit
+    # boundaries; skipping them shortens every key without changing the
+    # ordering (digit runs already rank before text runs)
+    return tuple([(0, int(p)) if p.isdigit() else (1, p)
+                  for p in _NAT_SPLIT_RE.split(s.lower()) if p])
+
+
+@functools.lru_cache(maxsize=None)
 def natural_sort_key(path: str, root_folder: str = None):
     """Return a key that naturally sorts by folder path components then filename (ascending)."""
-    def split_parts(s: str):
-        tokens = re.split(r"(\d+)", s.lower())
-        return tuple((0, int(p)) if p.isdigit() else (1, p) for p in tokens)
     # Use relative path to the root folder when provided so top-level dir order comes first
     rel_path = os.path.relpath(path, root_folder) if root_folder else os.path.normpath(path)
-    components = rel_path.split(os.sep)
     # Sort by each component using natural ordering (numbers before letters within each token)
-    return tuple(split_parts(component) for component in components)
+    return tuple([_split_parts(component) for component in rel_path.split(os.sep)])
+
+
+def sort_paths(paths: List[str]) -> List[str]:
+    """Sort paths hierarchically and naturally, computing each sort key once."""
+    try:
+        root = os.path.commonpath(paths) if paths else None
+    except Exception:
+        root = None
+    keyed = [(natural_sort_key(path, root), path) for path in paths]
+    keyed.sort()
+    return [path for _key, path in keyed]
 
 
 class PDFCombinerCLI:
     def __init__(self):
         self.combined_pdf = None
         self.output_path = None
-        
+        # Page counts keyed by (path, mtime, size) so repeat scans are free
+        self._info_cache = {}
+
     def find_pdf_files(self, folder_path: str, recursive: bool = False) -> List[str]:
         """Find all PDF files in the specified folder. If recursive, include subfolders."""
-        folder = Path(folder_path)
-        candidates: List[str] = []
+        # A single walk with a case-insensitive suffix check covers both
+        # .pdf and .PDF without two glob passes over the tree
         if recursive:
-            candidates.extend([str(p) for p in folder.rglob("*.pdf")])
-            candidates.extend([str(p) for p in folder.rglob("*.PDF")])
+            keyed = []
+            for dirpath, _dirnames, filenames in os.walk(folder_path):
+                for name in filenames:
+                    if name.lower().endswith('.pdf'):
+                        path = os.path.join(dirpath, name)
+                        keyed.append((natural_sort_key(path, folder_path), path))
         else:
-            candidates.extend([str(p) for p in folder.glob("*.pdf")])
-            candidates.extend([str(p) for p in folder.glob("*.PDF")])
+            with os.scandir(folder_path) as entries:
+                keyed = [(natural_sort_key(entry.name), entry.path)
+                         for entry in entries
+                         if entry.is_file()
+                         and entry.name.lower().endswith('.pdf')]
         # Sort files naturally (1.pdf, 2.pdf, 10.pdf instead of 1.pdf, 10.pdf, 2.pdf)
-        candidates.sort(key=lambda p: natural_sort_key(p, folder_path))
-        return candidates
+        keyed.sort()
+        return [path for _key, path in keyed]
     
     def get_pdf_info(self, pdf_path: str) -> Tuple[str, int]:
         """Get PDF filename and page count."""
+        filename = os.path.basename(pdf_path)
         try:
-            from PyPDF2 import PdfReader  # Lazy import
-            with open(pdf_path, 'rb') as file:
-                reader = PdfReader(file)
-                page_count = len(reader.pages)
-                filename = os.path.basename(pdf_path)
-                return filename, page_count
+            import pikepdf  # Lazy import
+        except ImportError:
+            pikepdf = None
+        try:
+            stat = os.stat(pdf_path)
+            cache_key = (pdf_path, stat.st_mtime, stat.st_size)
+            page_count = self._info_cache.get(cache_key)
+            if page_count is None:
+                if pikepdf is not None:
+                    # pikepdf resolves the page tree from the xref table
+                    # without parsing every object in the file
+                    with pikepdf.Pdf.open(pdf_path) as pdf:
+                        page_count = len(pdf.pages)
+                else:
+                    from PyPDF2 import PdfReader  # Lazy import
+                    with open(pdf_path, 'rb') as file:
+                        page_count = len(PdfReader(file).pages)
+                self._info_cache[cache_key] = page_count
+            return filename, page_count
         except ImportError:
             print("Error: PyPDF2 is not installed. Please install it using: pip install PyPDF2")
-            return os.path.basename(pdf_path), 0
+            return filename, 0
         except Exception as e:
             print(f"Error reading {pdf_path}: {e}")
-            return os.path.basename(pdf_path), 0
+            return filename, 0
     
     def combine_pdfs_with_bookmarks(self, pdf_files: List[str], output_path: str) -> bool:
         """Combine PDFs and create bookmarks for each file."""
+        print(f"Starting to combine {len(pdf_files)} PDF files...")
+
+        # Ensure deterministic, hierarchical natural ordering
+        pdf_files = sort_paths(pdf_files)
+
+        # Prefer the pikepdf (qpdf) backend when available; it merges through
+        # C++ instead of PyPDF2's Python-level object graph
+        try:
+            import pikepdf  # Lazy import
+        except ImportError:
+            pikepdf = None
+
+        if pikepdf is not None:
+            return self._combine_with_pikepdf(pikepdf, pdf_files, output_path)
+        return self._combine_with_pypdf2(pdf_files, output_path)
+
+    def _combine_with_pikepdf(self, pikepdf, pdf_files: List[str], output_path: str) -> bool:
+        """Combine PDFs using the pikepdf backend."""
+        try:
+            combined = pikepdf.Pdf.new()
+            current_page = 0
+            outline_entries = []
+
+            # Open inputs on a thread pool so parsing the next file overlaps
+            # appending the current one; qpdf releases the GIL while it reads.
+            # Opens are submitted through a small sliding window rather than
+            # all at once, so at most a handful of inputs (and their file
+            # descriptors) are held open ahead of the consumer.
+            # No exists() precheck: the open itself reports a missing file,
+            # saving a stat syscall per input
+            lookahead = 4
+            with concurrent.futures.ThreadPoolExecutor(max_workers=lookahead) as executor:
+                window = collections.deque()
+                next_index = 0
+                i = 0
+
+                # Consume in input order so pages and bookmarks stay sorted
+                while window or next_index < len(pdf_files):
+                    while next_index < len(pdf_files) and len(window) < lookahead:
+                        path = pdf_files[next_index]
+                        window.append((path, executor.submit(pikepdf.Pdf.open, path)))
+                        next_index += 1
+                    pdf_path, future = window.popleft()
+                    i += 1
+                    try:
+                        filename = os.path.basename(pdf_path)
+                        print(f"Processing {i}/{len(pdf_files)}: {filename}")
+
+                        with future.result() as src:
+                            page_count = len(src.pages)
+                            combined.pages.extend(src.pages)
+
+                            # Create bookmark for this PDF; splitext
+                            # strips only the extension, not '.pdf' elsewhere
+                            # in the name
+                            bookmark_name = os.path.splitext(filename)[0]
+
+                            # Bookmark points to the first page of this PDF;
+                            # entries are collected and written in one pass
+                            outline_entries.append((bookmark_name, current_page))
+
+                            first_page = current_page + 1
+                            current_page += page_count
+                            print(f"  Added {page_count} pages, bookmark '{bookmark_name}' at page {first_page}")
+
+                    except FileNotFoundError:
+                        print(f"Warning: {pdf_path} not found, skipping...")
+                    except Exception as e:
+                        print(f"Error processing {pdf_path}: {e}")
+                        return False
+
+            # Build the outline tree once, after all pages exist, instead
+            # of reopening and rewriting it per input file
+            with combined.open_outline() as outline:
+                for bookmark_name, page_number in outline_entries:
+                    outline.root.append(
+                        pikepdf.OutlineItem(bookmark_name, page_number)
+                    )
+
+            # Write the combined PDF. Inputs arrive with their streams
+            # already compressed, so skip recompression and the extra
+            # linearization pass; object streams keep the xref compact
+            print(f"Writing combined PDF to: {output_path}")
+            combined.save(
+                output_path,
+                object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                compress_streams=False,
+                stream_decode_level=pikepdf.StreamDecodeLevel.none,
+                linearize=False,
+            )
+
+            self.combined_pdf = output_path
+            print(f"Successfully created combined PDF with {current_page} total pages")
+            return True
+
+        except Exception as e:
+            print(f"Error combining PDFs: {e}")
+            return False
+
+    def _combine_with_pypdf2(self, pdf_files: List[str], output_path: str) -> bool:
+        """Combine PDFs using the PyPDF2 fallback backend."""
         try:
             from PyPDF2 import PdfReader, PdfWriter  # Lazy import
         except ImportError:
             print("Error: PyPDF2 is not installed. Please install it using: pip install PyPDF2")
             return False
-        
+
         try:
             writer = PdfWriter()
             current_page = 0
-            
-            print(f"Starting to combine {len(pdf_files)} PDF files...")
-            
-            # Ensure deterministic, hierarchical natural ordering
-            try:
-                root = os.path.commonpath(pdf_files) if pdf_files else None
-            except Exception:
-                root = None
-            pdf_files = sorted(pdf_files, key=lambda p: natural_sort_key(p, root))
-            
-            # Process each PDF file
+            outline_entries = []
+
+            # Process each PDF file; a missing file surfaces as
+            # FileNotFoundError from open(), no exists() precheck needed
             for i, pdf_path in enumerate(pdf_files, 1):
-                if not os.path.exists(pdf_path):
-                    print(f"Warning: {pdf_path} not found, skipping...")
-                    continue
-                
                 try:
                     filename = os.path.basename(pdf_path)
                     print(f"Processing {i}/{len(pdf_files)}: {filename}")
                     
-                    with open(pdf_path, 'rb') as file:
-                        reader = PdfReader(file)
-                        
-                        # Add all pages from this PDF
-                        for page in reader.pages:
-                            writer.add_page(page)
-                        
-                        # Create bookmark for this PDF
-                        # Remove .pdf extension for cleaner bookmark names
-                        bookmark_name = filename.replace('.pdf', '').replace('.PDF', '')
-                        
-                        # Add bookmark pointing to the first page of this PDF
-                        writer.add_outline_item(
-                            title=bookmark_name,
-                            page_number=current_page
-                        )
-                        
-                        current_page += len(reader.pages)
-                        print(f"  Added {len(reader.pages)} pages, bookmark '{bookmark_name}' at page {current_page - len(reader.pages) + 1}")
-                        
+                    # Map the file rather than streaming it; PyPDF2 seeks
+                    # heavily and the mapping serves reads straight from
+                    # the page cache without Python-level buffer copies
+                    with open(pdf_path, 'rb') as file, \
+                            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        reader = PdfReader(mm)
+                        # reader.pages.__len__ walks the page tree, so read
+                        # it once instead of three times per iteration
+                        page_count = len(reader.pages)
+
+                        # Add all pages from this PDF in one bulk append
+                        # rather than resolving each page individually
+                        writer.append_pages_from_reader(reader)
+
+                        # Create bookmark for this PDF; splitext strips
+                        # only the extension, not '.pdf' elsewhere in the name
+                        bookmark_name = os.path.splitext(filename)[0]
+
+                        # Bookmark points to the first page of this PDF;
+                        # entries are collected and added in one pass
+                        outline_entries.append((bookmark_name, current_page))
+
+                        first_page = current_page + 1
+                        current_page += page_count
+                        print(f"  Added {page_count} pages, bookmark '{bookmark_name}' at page {first_page}")
+
+                except FileNotFoundError:
+                    print(f"Warning: {pdf_path} not found, skipping...")
                 except Exception as e:
                     print(f"Error processing {pdf_path}: {e}")
                     return False
             
+            # Add all bookmarks once the page tree is final, so the
+            # outline dictionaries are only wired up once
+            for bookmark_name, page_number in outline_entries:
+                writer.add_outline_item(
+                    title=bookmark_name,
+                    page_number=page_number
+                )
+
             # Write the combined PDF
             print(f"Writing combined PDF to: {output_path}")
-            with open(output_path, 'wb') as output_file:
+            with open(output_path, 'wb', buffering=1 << 20) as output_file:
                 writer.write(output_file)
             
             self.combined_pdf = output_path